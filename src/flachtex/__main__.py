@@ -4,6 +4,7 @@ import os
 
 from .command_substitution import NewCommandSubstitution, find_new_commands
 from .comments import remove_comments
+from .filefinder import CachedFileSystem, FileFinder
 from .preprocessor import Preprocessor
 from .rules import ChangesRule, TodonotesRule
 
@@ -32,20 +33,21 @@ def parse_arguments():
         help="Automatically substitute custom commands.",
     )
     parser.add_argument("path", nargs=1, help="Path to main.tex")
-    args = parser.parse_args()
-    if not args.path:
-        parser.print_help()
-        exit(1)
-    return args
+    return parser.parse_args()
 
 
-def find_command_definitions(path) -> NewCommandSubstitution:
+def find_command_definitions(path, file_system=None) -> NewCommandSubstitution:
     """
     Parse the document once independently to extract new commands.
-    :param path:
-    :return:
+    :param path: The path to the main file.
+    :param file_system: The file system to read the files from. Passing the one of
+        the actual expansion lets it reuse the contents that have been read here.
+    :return: A substitution rule for all commands defined in the document.
     """
-    preprocessor = Preprocessor(os.path.dirname(path))
+    project_root = os.path.dirname(path)
+    preprocessor = Preprocessor(project_root)
+    if file_system is not None:
+        preprocessor.file_finder = FileFinder(project_root, file_system)
     doc = preprocessor.expand_file(path)
     cmds = find_new_commands(doc)
     ncs = NewCommandSubstitution()
@@ -57,13 +59,21 @@ def find_command_definitions(path) -> NewCommandSubstitution:
 def main():
     args = parse_arguments()
     file_path = args.path[0]
-    preprocessor = Preprocessor(os.path.dirname(file_path))
+    project_root = os.path.dirname(file_path)
+    preprocessor = Preprocessor(project_root)
+    # The document may be expanded twice, but every file is only read once.
+    file_system = CachedFileSystem()
+    preprocessor.file_finder = FileFinder(project_root, file_system)
     if args.todos:
         preprocessor.skip_rules.append(TodonotesRule())
     if args.changes:
         preprocessor.substitution_rules.append(ChangesRule(args.changes_prefix))
     if args.newcommand:
-        preprocessor.substitution_rules.append(find_command_definitions(file_path))
+        # The definitions have to be known while expanding, as the substituted
+        # commands can contain imports.
+        preprocessor.substitution_rules.append(
+            find_command_definitions(file_path, file_system)
+        )
     doc = preprocessor.expand_file(file_path)
 
     if args.comments:
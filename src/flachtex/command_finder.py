@@ -5,11 +5,33 @@ could not be tricked.
 The following code can still be tricked by implicit parameters (no brackets {}),
 but otherwise should be safe.
 """
+import functools
 import logging
+import re
 import typing
 
 _logger = logging.getLogger(__file__)
 
+# The only parts of a LaTeX-document that matter for finding commands. Everything
+# in between is plain text and can be jumped over.
+_TOKEN_RE = re.compile(
+    r"(?P<comment>%[^\n]*)"  # a comment until the end of the line
+    r"|\\(?P<command>(?:[^\W\d_]|\*)+)"  # a command like \\todo or \\newcommand*
+    r"|(?P<escaped>\\.?)"  # an escaped character like \\% or \\\\
+    r"|(?P<bracket>[{}\[\]])",
+    re.DOTALL,
+)
+# Brackets only matter within parameters. When searching for the next command, only
+# comments and escaped characters have to be skipped.
+_COMMAND_SEARCH_RE = re.compile(
+    r"%[^\n]*|\\(?P<command>(?:[^\W\d_]|\*)+)|\\.?",
+    re.DOTALL,
+)
+_NEW_COMMANDS = frozenset(
+    ("newcommand", "renewcommand", "newcommand*", "renewcommand*")
+)
+_WHITESPACE_AND_COMMENTS_RE = re.compile(r"(?:\s|%[^\n]*)*")
+
 
 class _ParserError(ValueError):
     def __init__(self, msg, position):
@@ -17,46 +39,80 @@ class _ParserError(ValueError):
         self.position = position
 
 
+@functools.lru_cache(maxsize=None)
+def _bracket_regex(begin: str, end: str) -> re.Pattern:
+    # Within a parameter, only the brackets matter. Comments and escaped characters
+    # are matched as well, such that brackets within them are skipped.
+    return re.compile(
+        r"%[^\n]*|\\.?|" + re.escape(begin) + "|" + re.escape(end), re.DOTALL
+    )
+
+
+def scan_balanced(text: str, pos: int, begin: str = "{", end: str = "}") -> int:
+    """
+    Find the bracket that closes an already opened bracket. Brackets in comments or
+    escaped brackets are ignored.
+    :param text: The text to be scanned.
+    :param pos: The position after the opening bracket.
+    :param begin: The opening bracket, e.g., '{' or '['.
+    :param end: The closing bracket, e.g., '}' or ']'.
+    :return: The position of the closing bracket.
+    """
+    depth = 1
+    for token in _bracket_regex(begin, end).finditer(text, pos):
+        if token.group() == begin:
+            depth += 1
+        elif token.group() == end:
+            depth -= 1
+            if depth == 0:
+                return token.start()
+    msg = f"Missing '{end}' for parameter."
+    raise _ParserError(msg, pos)
+
+
 class LatexStream:
     """
-    The LatexStreams job is to keep track of the reading position and
-    whether we are currently in a comment section or the current symbol
-    is escaped.
+    The LatexStreams job is to keep track of the reading position. Instead of
+    walking character by character, it jumps from token to token (comments,
+    commands, escaped characters, and brackets), such that comments and escaping
+    are handled by the regular expression.
     """
 
     def __init__(self, text: str, pos: int = 0):
         self._text = text
         self._pos = pos
-        self.is_escaped = False
-        self.in_comment = False
-        self._read_escape = False
 
-    def next(self) -> str:
+    def next_token(self, anchored: bool = False) -> typing.Optional[re.Match]:
         """
-        Return the next character and move the cursor the next position.
-        Update the current status regarding comment or escaping.
-        :return: Next character.
+        Return the next token and move the cursor behind it.
+        :param anchored: Only return a token that starts at the current position.
+        :return: The match of the token or None if there is no further token.
         """
-        if not self.has_next():
-            msg = "No next character."
-            raise _ParserError(msg, self._pos)
-        c = self._text[self._pos]
-        self._pos += 1
-        if self._read_escape:
-            self._read_escape = False
-            self.is_escaped = True
-        else:
-            self.is_escaped = False
-        if not self.is_escaped and c == "%":
-            self.in_comment = True
-        if c == "\n":
-            self.in_comment = False
-        if not self.in_comment and not self.is_escaped and c == "\\":
-            assert self._read_escape is False
-            self._read_escape = True
+        if anchored:
+            token = _TOKEN_RE.match(self._text, self._pos)
         else:
-            self._read_escape = False
-        return c
+            token = _TOKEN_RE.search(self._text, self._pos)
+        if token:
+            self._pos = token.end()
+        elif not anchored:
+            self._pos = len(self._text)
+        return token
+
+    def next_command(
+        self, regex: re.Pattern = _COMMAND_SEARCH_RE
+    ) -> typing.Optional[re.Match]:
+        """
+        Return the next command (skipping comments and escaped characters) and move
+        the cursor behind its name.
+        :param regex: The regex for the tokens. It may only match specific commands,
+            all other tokens without the group 'command' are skipped.
+        :return: The match with the group 'command' or None if there is no command.
+        """
+        token = regex.search(self._text, self._pos)
+        while token and not token.group("command"):
+            token = regex.search(self._text, token.end())
+        self._pos = token.end() if token else len(self._text)
+        return token
 
     def advance(self, n: int = 1) -> None:
         """
@@ -64,24 +120,16 @@ class LatexStream:
         :param n: Number of characters to advance.
         :return: None
         """
-        for _ in range(n):
-            try:
-                self.next()
-            except _ParserError:
-                break
+        self._pos = min(self._pos + n, len(self._text))
 
-    def peek(self, pure=False) -> typing.Optional[str]:
+    def peek(self) -> typing.Optional[str]:
         """
         Return the current character. Do not move the cursor.
-        :param pure: Only return characters that are not in a comment or escaped.
         :return: Next character.
         """
-        if pure and (self._read_escape or self.in_comment):
-            return None
         if not self.has_next():
             return None
-        c = self._text[self._pos]
-        return c
+        return self._text[self._pos]
 
     def has_next(self) -> bool:
         """
@@ -102,19 +150,19 @@ class LatexStream:
         Skips over all whitespace characters and comments.
         :return: None
         """
-        while self.in_comment or (self.peek().isspace() and not self.is_escaped):
-            self.next()
+        self._pos = _WHITESPACE_AND_COMMENTS_RE.match(self._text, self._pos).end()
 
     def __iter__(self):
         """
-        Iterate over all characters. You can use the other methods during the
+        Iterate over all tokens. You can use the other methods during the
         iteration, allowing you for example to skip all whitespaces and comments
         in the loop.
-        :return: All characters.
+        :return: All tokens.
         """
-        while self.has_next():
-            c = self.next()
-            yield c
+        token = self.next_token()
+        while token:
+            yield token
+            token = self.next_token()
 
 
 class CommandMatch:
@@ -122,6 +170,8 @@ class CommandMatch:
     A match of the CommandFinder.
     """
 
+    __slots__ = ("command", "start", "end", "parameters", "opt_parameters")
+
     def __init__(
         self,
         command: str,
@@ -172,6 +222,7 @@ class CommandFinder:
     def __init__(self, strict=False):
         self._strict = strict
         self._commands = {}
+        self._search_regex = None  # built on demand for the registered commands
 
     def add_command(self, name, num_params=1, num_opt=0):
         """
@@ -181,54 +232,65 @@ class CommandFinder:
         :return:
         """
         self._commands[name] = (num_params, num_opt)
+        self._search_regex = None
         return self
 
+    def _get_search_regex(self) -> re.Pattern:
+        # Only the registered commands (and the definitions to be skipped) are
+        # matched as commands, such that all other commands are rejected by the
+        # regex instead of by comparing their names in Python.
+        if self._search_regex is None:
+            names = sorted(set(self._commands) | _NEW_COMMANDS, key=len, reverse=True)
+            self._search_regex = re.compile(
+                r"%[^\n]*"
+                r"|\\(?P<command>"
+                + "|".join(re.escape(name) for name in names)
+                + r")(?![^\W\d_]|\*)"  # the name must not continue
+                r"|\\.?",
+                re.DOTALL,
+            )
+        return self._search_regex
+
     def _read_parameters(self, stream, name: str):
-        if name not in self._commands:
+        num_params = self._commands.get(name)
+        if num_params is None:
             return [], []
-        n, n_opt = self._commands[name]
+        n, n_opt = num_params
         opt_params = [
             self._read_parameter(stream, "[", "]", False) for _ in range(n_opt)
         ]
         params = [self._read_parameter(stream, "{", "}") for _ in range(n)]
         return opt_params, params
 
-    def _read_command_name(self, stream):
+    def _read_command_name(self, stream: LatexStream) -> str:
         stream.skip_whitespace_and_comments()
-        if stream.peek(True) != "\\":
+        token = stream.next_token(anchored=True)
+        if not token or token.lastgroup not in ("command", "escaped"):
             msg = f"No command. Next character is '{stream.peek()}'."
             raise _ParserError(msg, stream.pos())
-        command = ""
-        stream.next()  # skip '\'
-        while stream.has_next() and (stream.peek().isalpha() or stream.peek() == "*"):
-            command += stream.next()
-        return command
+        return token.group("command") or ""
 
     def _read_parameter(
         self, stream: LatexStream, begin: str, end: str, mandatory=True
     ):
         stream.skip_whitespace_and_comments()
-        if not mandatory and stream.peek(True) != begin:
+        c = stream.peek()
+        if not mandatory and c != begin:
             # No begin-symbol ({[) -> no parameter if not mandatory
             return None
-        if stream.peek(True) == begin:  # properly encapsulated parameter.
-            depth = 1
+        if c == begin:  # properly encapsulated parameter.
             stream.advance()
             start = stream.pos()  # after {[
-            while depth > 0:
-                if stream.peek(True) == begin:
-                    depth += 1
-                if stream.peek(True) == end:
-                    depth -= 1
-                stream.advance()
-            return (start, stream.pos() - 1)  # at }]
+            stop = scan_balanced(stream._text, start, begin, end)  # at }]
+            stream.advance(stop + 1 - start)
+            return (start, stop)
         else:  # parameter without begin/end-symbols ([],{})
             if self._strict:
                 context = stream._text[stream.pos() - 10 : stream.pos() + 10]
                 msg = f"Parameters without brackets ('{context}')."
                 raise _ParserError(msg, stream.pos())
             start = stream.pos()
-            if stream.peek() == "\\":
+            if c == "\\":
                 context = stream._text[stream.pos() - 10 : stream.pos() + 10]
                 logging.getLogger("flachtex").warning(
                     f"Ambiguous parameters due to missing brackets ('{context}')."
@@ -254,46 +316,38 @@ class CommandFinder:
         :param begin: The point to start in the text.
         :return:
         """
-        stream = LatexStream(text, begin)
-        while stream.has_next():
+        return next(self._find_matches(LatexStream(text, begin)), None)
+
+    def find_all(self, text: str) -> typing.Iterator[CommandMatch]:
+        if not any("\\" + name in text for name in self._commands):
+            # a cheap substring search shows that none of the commands occurs
+            return iter(())
+        # A single stream for all matches, as it continues after the last one.
+        return self._find_matches(LatexStream(text, 0))
+
+    def _find_matches(self, stream: LatexStream) -> typing.Iterator[CommandMatch]:
+        commands = self._commands
+        regex = self._get_search_regex()
+        token = stream.next_command(regex)
+        while token:
+            command = token.group("command")
             try:
-                if stream.peek(True) == "\\":
-                    begin = stream.pos()
-                    command = self._read_command_name(stream)
-                    if command in (
-                        "newcommand",
-                        "renewcommand",
-                        "newcommand*",
-                        "renewcommand*",
-                    ):
-                        if command in self._commands:
-                            opt_params, params = self._read_new_command_parameters(
-                                stream
-                            )
-                            end = stream.pos()
-                            return CommandMatch(command, begin, end, params, opt_params)
-                        else:
-                            #  In the \\newcommand definition, the commands are not actually
-                            # applied, so we want to skip them.
-                            self._read_parameter(
-                                stream, "{", "}"
-                            )  # skip definition name
-                    elif command in self._commands:
-                        opt_params, params = self._read_parameters(stream, command)
-                        end = stream.pos()
-                        return CommandMatch(command, begin, end, params, opt_params)
-
-                else:
-                    stream.next()
+                if command in _NEW_COMMANDS:
+                    if command in commands:
+                        opt_params, params = self._read_new_command_parameters(stream)
+                        yield CommandMatch(
+                            command, token.start(), stream.pos(), params, opt_params
+                        )
+                    else:
+                        #  In the \\newcommand definition, the commands are not actually
+                        # applied, so we want to skip them.
+                        self._read_parameter(stream, "{", "}")  # skip definition name
+                elif command in commands:
+                    opt_params, params = self._read_parameters(stream, command)
+                    yield CommandMatch(
+                        command, token.start(), stream.pos(), params, opt_params
+                    )
             except _ParserError as pe:
                 _logger.error(str(pe))
                 stream.advance()
-        return None
-
-    def find_all(self, text: str):
-        begin = 0
-        result = self.find(text, begin)
-        while result:
-            yield result
-            begin = result.end
-            result = self.find(text, begin)
+            token = stream.next_command(regex)
@@ -7,12 +7,35 @@ import logging
 import re
 import typing
 
-from flachtex.command_finder import CommandFinder
+from flachtex.command_finder import CommandFinder, scan_balanced
 from flachtex.rules import Substitution, SubstitutionRule
 from flachtex.traceable_string import TraceableString
 
 _logger = logging.getLogger(__file__)
 
+# A comment has to take its newline (or the end), such that there is only one way to
+# match it. Otherwise, a run of `%` can be split in exponentially many ways when the
+# rest of a definition does not match.
+_SPACE_OR_COMMENT = r"(?:\s|%[^\n]*(?:\n|\Z))*"
+# Matches the beginning of a definition `\newcommand{\name}[n]{` up to the opening
+# bracket of the body. Comments and escaped characters are matched as well, such that
+# definitions within them are skipped.
+_NEW_COMMAND_RE = re.compile(
+    r"(?P<definition>\\(?:re)?newcommand\*?"
+    + _SPACE_OR_COMMENT
+    + r"\{(?P<name>[^{}%]*)\}"
+    + _SPACE_OR_COMMENT
+    + r"(?:\[(?P<num>\s*[0-9]+\s*)\]"
+    + _SPACE_OR_COMMENT
+    + r")?\{)"
+    r"|%[^\n]*"
+    r"|\\.",
+    re.DOTALL,
+)
+_SPACES_RE = re.compile(" *")
+# Matches the placeholders #1 to #9 of the parameters (but not #10).
+_PARAMETER_RE = re.compile(r"#([1-9])(?![0-9])")
+
 
 class NewCommandDefinition:
     """
@@ -20,6 +43,8 @@ class NewCommandDefinition:
     parameters are not supported right now.
     """
 
+    __slots__ = ("name", "num_parameters", "command")
+
     def __init__(
         self, name: TraceableString, num_parameters: int, command: TraceableString
     ):
@@ -48,22 +73,23 @@ def find_new_commands(
     :param latex_document: The LaTeX-document to be scanned.
     :return: Iterator on all command definitions.
     """
-    cf = CommandFinder(strict=True)
-    cf.add_command("newcommand", 2, 1)
-    cf.add_command("newcommand*", 2, 1)
-    cf.add_command("renewcommand", 2, 1)
-    cf.add_command("renewcommand*", 2, 1)
-    for match in cf.find_all(str(latex_document)):
-        command_name = latex_document[match.parameters[0][0] : match.parameters[0][1]]
-        command = latex_document[match.parameters[1][0] : match.parameters[1][1]]
-        if match.opt_parameters[0]:
-            opt_par_range = match.opt_parameters[0]
-            num_parameters = int(
-                str(latex_document[opt_par_range[0] : opt_par_range[1]])
-            )
-        else:
-            num_parameters = 0
-        yield NewCommandDefinition(command_name, num_parameters, command)
+    text = str(latex_document)
+    match = _NEW_COMMAND_RE.search(text)
+    while match:
+        pos = match.end()
+        if match.group("definition"):
+            try:
+                end = scan_balanced(text, match.end(), "{", "}")
+            except ValueError as e:
+                _logger.error(str(e))
+            else:
+                command_name = latex_document[match.start("name") : match.end("name")]
+                command = latex_document[match.end() : end]
+                num = match.group("num")
+                num_parameters = int(num) if num else 0
+                yield NewCommandDefinition(command_name, num_parameters, command)
+                pos = end + 1
+        match = _NEW_COMMAND_RE.search(text, pos)
 
 
 class NewCommandSubstitution(SubstitutionRule):
@@ -79,6 +105,8 @@ class NewCommandSubstitution(SubstitutionRule):
         self._commands = {}
         self._command_finder = CommandFinder()
         self._space_sub = space_substitution
+        # parameterless commands whose following spaces have to be simulated
+        self._space_sensitive = set()
 
     def new_command(self, definition: NewCommandDefinition) -> None:
         """
@@ -94,42 +122,40 @@ class NewCommandSubstitution(SubstitutionRule):
                 f"Multiple definitions of command '{name}'. Substitution may be buggy."
             )
         self._commands[name] = definition
-        _logger.info(f"Detected {definition}")
+        uses_xspace = str(definition.command).rstrip().endswith("\\xspace")
+        if definition.num_parameters == 0 and not uses_xspace:
+            self._space_sensitive.add(name)
+        else:
+            self._space_sensitive.discard(name)
+        _logger.info("Detected %s", definition)  # only formatted if enabled
         self._command_finder.add_command(name, definition.num_parameters)
 
     def _get_substitution(
         self, command: TraceableString, parameters: typing.List[TraceableString]
     ) -> TraceableString:
-        for i, p in enumerate(parameters):
-            i += 1
-            offset = 0
-            for match in re.finditer(
-                f"(?P<arg>#{i})([^0-9])", str(command) + " ", re.MULTILINE
-            ):
-                l = (match.end("arg") - match.start("arg")) - 1
-                command = (
-                    command[: match.start("arg") + offset]
-                    + p
-                    + command[(match.end("arg")) + offset :]
-                )
-                offset += len(p) - l
-        return command
+        parts = []
+        last = 0
+        for match in _PARAMETER_RE.finditer(str(command)):
+            i = int(match.group(1))
+            if i > len(parameters):
+                continue
+            parts.append(command[last : match.start()])
+            parts.append(parameters[i - 1])
+            last = match.end()
+        parts.append(command[last:])
+        return TraceableString.concat(parts)
 
     def find_all(self, content: TraceableString) -> typing.Iterable[Substitution]:
-        for match in self._command_finder.find_all(str(content)):
-            definition = self._commands[str(match.command)]
+        text = str(content)
+        for match in self._command_finder.find_all(text):
+            definition = self._commands[match.command]
             parameters = [content[p[0] : p[1]] for p in match.parameters]
             sub = self._get_substitution(definition.command, parameters)
             end = match.end
-            if (
-                self._space_sub
-                and definition.num_parameters == 0
-                and not str(sub).strip().endswith("\\xspace")
-            ):
+            if self._space_sub and match.command in self._space_sensitive:
                 # The usage of a command like "\\cmd bla" is actually equivalent to
                 # "\\cmd{}bla". This function tries to simulate this.
-                while content[end] == " ":
-                    end += 1
+                end = _SPACES_RE.match(text, end).end()
                 if end != match.end:
                     sub += TraceableString("{}", None)  # add non-space separator
             yield Substitution(match.start, end, sub)
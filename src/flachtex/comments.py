@@ -8,6 +8,8 @@ import re
 
 from .traceable_string import TraceableString
 
+_COMMENT_RE = re.compile(r"^.*?(?<!\\)(?P<comment>%..*\n)", re.MULTILINE)
+
 
 def remove_comments(content: TraceableString) -> TraceableString:
     """
@@ -15,13 +17,10 @@ def remove_comments(content: TraceableString) -> TraceableString:
     :param content:
     :return:
     """
-    regex = re.compile(r"^.*?(?<!\\)(?P<comment>%..*\n)", re.MULTILINE)
-    comments = []
-    for match in regex.finditer(str(content)):
-        comments.append((match.start("comment"), match.end("comment")))
-    comments.sort()
-    offset = 0
-    for comment in comments:
-        content = content[: comment[0] + offset] + content[comment[1] + offset :]
-        offset -= comment[1] - comment[0]
-    return content
+    parts = []
+    last = 0
+    for match in _COMMENT_RE.finditer(str(content)):
+        parts.append(content[last : match.start("comment")])
+        last = match.end("comment")
+    parts.append(content[last:])
+    return TraceableString.concat(parts)
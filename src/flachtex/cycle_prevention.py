@@ -1,3 +1,6 @@
+import os.path
+
+
 class CycleException(Exception):
     def __init__(self, path, origin):
         self.path = path
@@ -10,13 +13,23 @@ class CycleException(Exception):
 
 
 class CyclePrevention:
+    """
+    Keeps track of the files that are currently being expanded. The paths are
+    resolved such that './main.tex' or a symlinked file is recognized as the same
+    file. This costs a few stat calls per push, but a file is pushed only once when
+    it is expanded, which reads the whole file anyway.
+    """
+
     def __init__(self):
-        self._checked_paths = []
+        self._checked_paths = set()
+        self._stack = []
 
     def push(self, path, context=None):
-        if path in self._checked_paths:
+        key = os.path.realpath(path)
+        if key in self._checked_paths:
             raise CycleException(path, context)
-        self._checked_paths.append(path)
+        self._checked_paths.add(key)
+        self._stack.append(key)
 
     def pop(self):
-        self._checked_paths.pop()
+        self._checked_paths.discard(self._stack.pop())
@@ -1,26 +1,95 @@
+import functools
 import os.path
+import sys
 import typing
 from pathlib import Path
 
 
+@functools.lru_cache(maxsize=4096)
+def _normpath(path: str) -> str:
+    # interned, as the paths are used as keys and origins over and over again
+    return sys.intern(os.path.normpath(path))
+
+
 class FileSystem:
     """
     Wraps the file system access such that it could be replaced with a simple dict
     to ease testing.
+    The existence checks are answered from cached directory listings, as many
+    candidates in the same few directories are probed for the imports. The
+    Preprocessor clears them for every expansion, such that changed files are
+    noticed.
     """
 
+    def __init__(self):
+        self._dir_cache = {}
+
+    def clear_cache(self) -> None:
+        """
+        Forget the directory listings.
+        :return: None
+        """
+        self._dir_cache.clear()
+
+    def _files_in(
+        self, directory: str
+    ) -> typing.Tuple[typing.FrozenSet[str], typing.FrozenSet[str]]:
+        # the names of the regular files, as they are and casefolded
+        files = self._dir_cache.get(directory)
+        if files is None:
+            try:
+                with os.scandir(directory if directory else ".") as entries:
+                    names = frozenset(e.name for e in entries if e.is_file())
+            except OSError:  # the directory does not exist
+                names = frozenset()
+            files = (names, frozenset(name.casefold() for name in names))
+            self._dir_cache[directory] = files
+        return files
+
     def __contains__(self, item) -> bool:
-        return os.path.exists(item) and os.path.isfile(item)
+        directory, name = os.path.split(_normpath(item))
+        names, casefolded_names = self._files_in(directory)
+        if name in names:
+            return True
+        # Only the file system itself knows whether it is case-insensitive (e.g.,
+        # on macOS or Windows), so it is asked if the name differs only in case.
+        return name.casefold() in casefolded_names and Path(item).is_file()
 
     def __getitem__(self, item) -> str:
         if item not in self:
             msg = f"Could not find {item}."
             raise KeyError(msg)
-        with Path(item).open(errors="ignore") as f:
-            try:
-                return str(f.read())
-            except Exception as e:
-                return f"\n%ERROR (flachtex): Could not read '{item}': '{e}'\n"
+        try:
+            with Path(item).open(encoding="utf-8", errors="ignore") as f:
+                try:
+                    return f.read()
+                except Exception as e:
+                    return f"\n%ERROR (flachtex): Could not read '{item}': '{e}'\n"
+        except OSError as e:  # removed since the directory has been listed
+            msg = f"Could not find {item}."
+            raise KeyError(msg) from e
+
+
+class CachedFileSystem:
+    """
+    Wraps a file system and keeps the contents of the files that have been read,
+    such that a document can be expanded a second time without reading its files
+    again.
+    """
+
+    def __init__(self, file_system=None):
+        self._file_system = file_system if file_system is not None else FileSystem()
+        self._contents = {}
+
+    def __contains__(self, item) -> bool:
+        return item in self._contents or item in self._file_system
+
+    def __getitem__(self, item) -> str:
+        content = self._contents.get(item)
+        if content is None:
+            content = self._file_system[item]
+            self._contents[item] = content
+        return content
 
 
 class FileFinder:
@@ -39,6 +108,16 @@ class FileFinder:
     def set_root(self, project_root: str):
         self._PATH = [project_root]
 
+    def clear_cache(self) -> None:
+        """
+        Forget what the file system has cached, such that changed files are
+        noticed. A file system without a cache, e.g., a dict, is left as it is.
+        :return: None
+        """
+        clear_cache = getattr(self.file_system, "clear_cache", None)
+        if clear_cache is not None:
+            clear_cache()
+
     def find_best_matching_path(self, path: str, origin: str) -> str:
         """
         Returns the best path relative to the current working directory that resolves the
@@ -48,14 +127,16 @@ class FileFinder:
             path.
         :return:
         """
+        tried = []
         for p in self.get_checked_paths(path, origin):
             if p in self.file_system:
                 return p
-        msg = f"Not matching file found. Tried: {', '.join(self.get_checked_paths(path, origin))}"
+            tried.append(p)
+        msg = f"Not matching file found. Tried: {', '.join(tried)}"
         raise KeyError(msg)
 
     def _normalize(self, path: str):
-        return os.path.normpath(path)
+        return _normpath(path)
 
     def get_checked_paths(self, path: str, origin: str) -> typing.Iterable[str]:
         """
@@ -68,21 +149,28 @@ class FileFinder:
         """
         # if it is an absolute path, try this one first
         if os.path.isabs(path):
-            yield os.path.normpath(path)
-            yield os.path.normpath(path) + ".tex"
+            p = self._normalize(path)
+            yield p
+            yield p + ".tex"
         # then try to go relative from the origin file
         d = os.path.dirname(origin)
-        yield self._normalize(os.path.join(d, path))
-        yield self._normalize(os.path.join(d, path)) + ".tex"
+        p = self._normalize(os.path.join(d, path))
+        yield p
+        yield p + ".tex"
         # then try to use the include directories
         for include in self._PATH:
-            yield self._normalize(os.path.join(include, path))
-            yield self._normalize(os.path.join(include, path)) + ".tex"
+            p = self._normalize(os.path.join(include, path))
+            yield p
+            yield p + ".tex"
         # finally, in a last attempt, go upwards from the origin file
         while d != self._project_root:  # stop if the root directory has been reached
-            yield self._normalize(os.path.join(d, path))
-            yield self._normalize(os.path.join(d, path)) + ".tex"
-            d = os.path.dirname(d)  # go one directory above
+            p = self._normalize(os.path.join(d, path))
+            yield p
+            yield p + ".tex"
+            parent = os.path.dirname(d)  # go one directory above
+            if parent == d:  # the top has been reached without passing the root
+                break
+            d = parent
 
     def read(self, path) -> str:
         """
@@ -31,7 +31,11 @@ class Preprocessor:
         :param file_path: Path to the file.
         :return: Preprocessed file content
         """
-        content = TraceableString(self.file_finder.read(file_path), origin=file_path)
+        self.file_finder.clear_cache()
+        return self._preprocess(self.file_finder.read(file_path), file_path)
+
+    def _preprocess(self, raw_content: str, file_path: str) -> TraceableString:
+        content = TraceableString(raw_content, origin=file_path)
         content = apply_skip_rules(content, self.skip_rules)
         content = apply_substitution_rules(content, self.substitution_rules)
         return content
@@ -45,40 +49,60 @@ class Preprocessor:
         imports = find_imports(content, self.import_rules)
         return imports
 
-    def _add_structure(self, path: str, included_files: typing.List[str]):
+    def _add_structure(
+        self, path: str, raw_content: str, included_files: typing.List[str]
+    ):
         self.structure[path] = {
-            "content": self.file_finder.read(path),
+            "content": raw_content,
             "includes": included_files,
         }
 
     def expand_file(
-        self, file_path: str, _cycle_prevention: typing.Optional[CyclePrevention] = None
+        self,
+        file_path: str,
+        _cycle_prevention: typing.Optional[CyclePrevention] = None,
+        _expanded: typing.Optional[typing.Dict[str, TraceableString]] = None,
     ) -> TraceableString:
         """
         Expand/flatten the file. This is performed recursively, but there will be an
         excepetion in case of cyclic include-commands.
         :param file_path: The path to the file to be included.
         :param _cycle_prevention: Internal use for preventing cyclic inclusions.
+        :param _expanded: Internal use for expanding files that are included multiple
+            times only once.
         :return: A flat LaTeX-document containing all included files.
         """
-        _cycle_prevention = (
-            _cycle_prevention if _cycle_prevention else CyclePrevention()
-        )
-        offset = 0
+        if _cycle_prevention is None:
+            # a new expansion, for which the files may have changed
+            self.file_finder.clear_cache()
+            _cycle_prevention = CyclePrevention()
+        _expanded = _expanded if _expanded is not None else {}
         _cycle_prevention.push(file_path, context=file_path)
-        content = self.read_file(file_path)
+        # read the file only once for its content and the structure
+        raw_content = self.file_finder.read(file_path)
+        content = self._preprocess(raw_content, file_path)
         imports = self.find_imports(content)
-        self._add_structure(file_path, [import_.path for import_ in imports])
+        self._add_structure(
+            file_path, raw_content, [import_.path for import_ in imports]
+        )
+        parts = []
+        last = 0
         for match in imports:
             insertion_file = self.file_finder.find_best_matching_path(
                 match.path, origin=file_path
             )
-            insertion = self.expand_file(insertion_file, _cycle_prevention)
-            content = (
-                content[: match.start + offset]
-                + insertion
-                + content[match.end + offset :]
-            )
-            offset += len(insertion) - len(match)
+            parts.append(content[last : match.start])
+            if insertion_file in _expanded:
+                # A file that has already been expanded cannot be part of a cycle
+                # and the traceable strings are not modified in place.
+                parts.append(_expanded[insertion_file])
+            else:
+                parts.append(
+                    self.expand_file(insertion_file, _cycle_prevention, _expanded)
+                )
+            last = match.end
+        parts.append(content[last:])
         _cycle_prevention.pop()
-        return content
+        expanded = TraceableString.concat(parts)
+        _expanded[file_path] = expanded
+        return expanded
@@ -4,10 +4,12 @@ import re
 import typing
 
 from flachtex.traceable_string import TraceableString
-from flachtex.utils import Range
+from flachtex.utils import Range, sort_ranges
 
 
 class Import(Range):
+    __slots__ = ("path",)
+
     def __init__(self, start: int, end: int, path: str):
         super().__init__(start, end)
         self.path = path
@@ -20,42 +22,107 @@ class ImportRule(abc.ABC):
 
 
 class RegexImportRule(ImportRule):
-    def __init__(self, regex: str):
-        self.regex = re.compile(regex, re.MULTILINE | re.DOTALL)
+    def __init__(self, regex: typing.Union[str, re.Pattern]):
+        """
+        :param regex: The regex, which is compiled with MULTILINE and DOTALL. The
+            built-in rules pass an already compiled one.
+        """
+        if isinstance(regex, str):
+            regex = re.compile(regex, re.MULTILINE | re.DOTALL)
+        self.regex = regex
 
     @abc.abstractmethod
     def determine_include(self, match: re.Match) -> Import:
         pass
 
     def find_all(self, content: str) -> typing.Iterable[Import]:
-        for match in self.regex.finditer(content):
-            yield self.determine_include(match)
+        if not self._may_match(content):
+            return []
+        determine_include = self.determine_include
+        return [determine_include(match) for match in self.regex.finditer(content)]
+
+    def _may_match(self, content: str) -> bool:
+        # A cheap substring search for the built-in patterns. It is looked up by
+        # the pattern, such that a rule with any other pattern is always searched.
+        triggers = _TRIGGER_SUBSTRINGS.get(self.regex)
+        return triggers is None or any(t in content for t in triggers)
+
+
+# The part of a line in front of a command that is neither commented out nor escaped.
+_UNCOMMENTED_PREFIX_RE = re.compile(r"(?:[^\\%\n]|\\.)*")
+
+
+class _LinePrefixImportRule(RegexImportRule):
+    """
+    Base for rules whose commands only count if the part of the line in front of
+    them passes `is_valid_prefix`. The regex only searches the commands, and the
+    line is only checked for the found ones. This avoids scanning every line with
+    a backtracking prefix.
+    """
+
+    def find_all(self, content: str) -> typing.Iterable[Import]:
+        if not self._may_match(content):
+            return []
+        determine_include = self.determine_include
+        is_valid_prefix = self.is_valid_prefix
+        search = self.regex.search
+        imports = []
+        match = search(content)
+        while match:
+            start = match.start("command")
+            line_start = content.rfind("\n", 0, start) + 1
+            if is_valid_prefix(content, line_start, start):
+                imports.append(determine_include(match))
+                match = search(content, match.end())
+            else:
+                # An unclosed command in a comment can span the following lines,
+                # which must still be searched for commands.
+                match = search(content, start + 1)
+        return imports
+
+    @abc.abstractmethod
+    def is_valid_prefix(self, content: str, begin: int, end: int) -> bool:
+        pass
+
+
+class _UncommentedImportRule(_LinePrefixImportRule):
+    """
+    Base for rules whose commands must not be within a comment, i.e., the line in
+    front must not contain a `%` (not `\\%`) or end with an escaping backslash.
+    """
+
+    def is_valid_prefix(self, content: str, begin: int, end: int) -> bool:
+        return _UNCOMMENTED_PREFIX_RE.fullmatch(content, begin, end) is not None
 
 
-class NativeImportRule(RegexImportRule):
+class NativeImportRule(_UncommentedImportRule):
     """
     Detects includes of the form `\\input{/path/file.tex}` and `\\include{/path/file.tex}`
     """
 
+    _REGEX = re.compile(
+        r"(?P<command>\\(?:input|include)\{(?P<path>[^}]*)\})", re.MULTILINE | re.DOTALL
+    )
+
     def __init__(self):
-        expr = r"^(([^%\n])|(\\%))*(?P<command>((\\input)|(\\include))\{(?P<path>[^}]*?)\})"
-        super().__init__(expr)
+        super().__init__(self._REGEX)
 
     def determine_include(self, match: re.Match):
         import_path = match.group("path").strip()
         return Import(match.start("command"), match.end("command"), import_path)
 
 
-class SubimportRule(RegexImportRule):
+class SubimportRule(_UncommentedImportRule):
     """
     Detects imports by the subimport package.
     These can have the form `\\subimport{path}{file}` or  `\\subimport*{path}{file}`.
     """
 
-    expr = r"^(([^%])|(\\%))*?(?P<command>\\subimport\*?\{(?P<dir>[^}]*)\}\{(?P<file>[^}]*)\})"
+    expr = r"(?P<command>\\subimport\*?\{(?P<dir>[^}]*)\}\{(?P<file>[^}]*)\})"
+    _REGEX = re.compile(expr, re.MULTILINE | re.DOTALL)
 
     def __init__(self):
-        super().__init__(self.expr)
+        super().__init__(self._REGEX)
 
     def determine_include(self, match: re.Match):
         # This function implements the functionality for the subimports library.
@@ -67,11 +134,19 @@ class SubimportRule(RegexImportRule):
 
 
 # %%FLACHTEX-EXPLICIT-IMPORT[path/file.tex]
-class ExplicitImportRule(RegexImportRule):
+class ExplicitImportRule(_LinePrefixImportRule):
+    # Starts with the literal, such that `re` can search for it directly. That only
+    # whitespace is in front of it on its line is checked for the matches.
+    _REGEX = re.compile(
+        r"(?P<command>%%FLACHTEX-EXPLICIT-IMPORT\[(?P<path>[^\]]*)\])",
+        re.MULTILINE | re.DOTALL,
+    )
+
     def __init__(self):
-        super().__init__(
-            r"^\s*(?P<command>%%FLACHTEX-EXPLICIT-IMPORT\[(?P<path>[^}]*)\])"
-        )
+        super().__init__(self._REGEX)
+
+    def is_valid_prefix(self, content: str, begin: int, end: int) -> bool:
+        return not content[begin:end].strip()
 
     def determine_include(self, match: re.Match):
         # We are using the group feature of regex to extract the path (<path>)
@@ -80,12 +155,18 @@ class ExplicitImportRule(RegexImportRule):
         return Import(match.start("command"), match.end("command"), import_path)
 
 
+# Substrings of which at least one is needed for a match of a built-in pattern.
+_TRIGGER_SUBSTRINGS = {
+    NativeImportRule._REGEX: ("\\input", "\\include"),
+    SubimportRule._REGEX: ("\\subimport",),
+    ExplicitImportRule._REGEX: ("%%FLACHTEX-EXPLICIT-IMPORT",),
+}
+
+
 def _sort_imports(imports: typing.List[Import]) -> typing.List[Import]:
-    imports.sort()
-    for i, e in enumerate(imports[:-1]):
-        if e.intersects(imports[i + 1]):
-            msg = "Intersecting imports."
-            raise ValueError(msg)
+    if any(sort_ranges(imports)):
+        msg = "Intersecting imports."
+        raise ValueError(msg)
     return imports
 
 
@@ -95,6 +176,6 @@ def find_imports(
     content = str(content)
     imports = []
     for rule in include_rules:
-        imports += list(rule.find_all(content))
+        imports.extend(rule.find_all(content))
     imports = _sort_imports(imports)
     return imports
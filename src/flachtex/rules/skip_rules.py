@@ -9,7 +9,7 @@ import typing
 
 from ..command_finder import CommandFinder
 from ..traceable_string import TraceableString
-from ..utils import Range
+from ..utils import Range, sort_ranges
 
 
 class SkipRule(abc.ABC):
@@ -23,12 +23,18 @@ class SkipRule(abc.ABC):
 
 
 class RegexSkipRule(SkipRule):
-    def __init__(self, regex: str):
-        self.regex = re.compile(regex, re.MULTILINE | re.DOTALL)
+    def __init__(self, regex: typing.Union[str, re.Pattern]):
+        """
+        :param regex: The regex, which is compiled with MULTILINE and DOTALL. The
+            built-in rules pass an already compiled one.
+        """
+        if isinstance(regex, str):
+            regex = re.compile(regex, re.MULTILINE | re.DOTALL)
+        self.regex = regex
 
     def find_all(self, content) -> typing.Iterable[Range]:
-        for match in self.regex.finditer(content):
-            yield self.determine_skip(match)
+        determine_skip = self.determine_skip
+        return [determine_skip(match) for match in self.regex.finditer(content)]
 
     @abc.abstractmethod
     def determine_skip(self, match: re.Match) -> Range:
@@ -41,14 +47,16 @@ class TodonotesRule(SkipRule):
     commands with \\todo[...]{...}.
     """
 
+    def __init__(self):
+        self._command_finder = CommandFinder()
+        self._command_finder.add_command("todo", 1, 1)
+
     def find_all(self, content) -> typing.Iterable[Range]:
-        cf = CommandFinder()
-        cf.add_command("todo", 1, 1)
-        for match in cf.find_all(str(content)):
+        for match in self._command_finder.find_all(str(content)):
             yield Range(match.start, match.end)
 
 
-class BasicSkipRule(RegexSkipRule):
+class BasicSkipRule(SkipRule):
     """
         Skips parts of the form
         ```
@@ -57,32 +65,67 @@ class BasicSkipRule(RegexSkipRule):
     %%FLACHTEX-SKIP-STOP
     """
 
-    def __init__(self):
-        super().__init__(
-            r"(?P<skipped_part>(^\s*%%FLACHTEX-SKIP-START).*?(^\s*%%FLACHTEX-SKIP-STOP))"
-        )
+    # The markers, which can be overridden by subclasses. Only whitespace may be in
+    # front of them on their line.
+    START = "%%FLACHTEX-SKIP-START"
+    STOP = "%%FLACHTEX-SKIP-STOP"
 
-    def determine_skip(self, match: re.Match):
-        span_to_be_skipped = Range(
-            match.start("skipped_part"), match.end("skipped_part")
-        )
-        return span_to_be_skipped
+    def find_all(self, content) -> typing.Iterable[Range]:
+        # Equivalent to the regex `(^\s*START).*?(^\s*STOP)` (MULTILINE, DOTALL), but
+        # the markers are searched with str.find instead of trying the pattern at
+        # every line and expanding `.*?`.
+        pos = 0
+        while True:
+            start = content.find(self.START, pos)
+            if start < 0:
+                return
+            begin = _first_line_start_of_whitespace(content, start, pos)
+            if begin is None:  # not at the beginning of a line
+                pos = start + 1
+                continue
+            after_start = start + len(self.START)
+            stop = content.find(self.STOP, after_start)
+            while (
+                stop >= 0
+                and _first_line_start_of_whitespace(content, stop, after_start) is None
+            ):
+                stop = content.find(self.STOP, stop + 1)
+            if stop < 0:
+                return
+            pos = stop + len(self.STOP)
+            yield Range(begin, pos)
+
+
+def _first_line_start_of_whitespace(
+    content: str, i: int, pos: int
+) -> typing.Optional[int]:
+    """
+    Returns the first line start q >= pos such that there is only whitespace between q
+    and i, i.e., where `^\\s*` could match up to i. None if there is no such q.
+    """
+    line_start = content.rfind("\n", 0, i) + 1
+    if line_start < pos or content[line_start:i].strip():
+        return None
+    q = i
+    while q > pos and content[q - 1].isspace():
+        q -= 1
+    if q > 0 and content[q - 1] != "\n":
+        q = content.find("\n", q) + 1
+    return q
 
 
 def _find_skips(content, skip_rules):
     content = str(content)
     skips = []
     for rule in skip_rules:
-        skips += list(rule.find_all(content))
+        skips.extend(rule.find_all(content))
     return skips
 
 
 def _sort_and_check_ranges(skips) -> typing.Iterable[Range]:
-    skips.sort()
-    for i, e in enumerate(skips[:-1]):
-        if e.intersects(skips[i + 1]):
-            msg = "Intersecting skipped parts."
-            raise ValueError(msg)
+    if any(sort_ranges(skips)):
+        msg = "Intersecting skipped parts."
+        raise ValueError(msg)
     return skips
 
 
@@ -98,8 +141,10 @@ def apply_skip_rules(
     """
     skips = _find_skips(content, skip_rules)
     sorted_skips = _sort_and_check_ranges(skips)
-    offset = 0
+    parts = []
+    last = 0
     for skip in sorted_skips:
-        content = content[: skip.start + offset] + content[skip.end + offset :]
-        offset -= len(skip)
-    return content
+        parts.append(content[last : skip.start])
+        last = skip.end
+    parts.append(content[last:])
+    return TraceableString.concat(parts)
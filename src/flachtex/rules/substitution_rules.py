@@ -8,10 +8,12 @@ import typing
 
 from flachtex.command_finder import CommandFinder
 from flachtex.traceable_string import TraceableString
-from flachtex.utils import Range
+from flachtex.utils import Range, sort_ranges
 
 
 class Substitution(Range):
+    __slots__ = ("replacement_text",)
+
     def __init__(
         self, start: int, end: int, replacement_text: typing.Optional[TraceableString]
     ):
@@ -43,16 +45,16 @@ class ChangesRule(SubstitutionRule):
         self._replaced = "chreplaced" if prefix else "replaced"
         self._highlight = "chhighlight" if prefix else "highlight"
         self._comment = "chcomment" if prefix else "comment"
+        self._command_finder = CommandFinder()
+        self._command_finder.add_command(self._added, 1, 1)
+        self._command_finder.add_command(self._deleted, 1, 1)
+        self._command_finder.add_command(self._replaced, 2, 1)
+        self._command_finder.add_command(self._highlight, 1, 1)
+        self._command_finder.add_command(self._comment, 1, 1)
 
     def find_all(self, content: TraceableString) -> typing.Iterable[Substitution]:
         assert isinstance(content, TraceableString)
-        cf = CommandFinder()
-        cf.add_command(self._added, 1, 1)
-        cf.add_command(self._deleted, 1, 1)
-        cf.add_command(self._replaced, 2, 1)
-        cf.add_command(self._highlight, 1, 1)
-        cf.add_command(self._comment, 1, 1)
-        for match in cf.find_all(str(content)):
+        for match in self._command_finder.find_all(str(content)):
             if match.command in (self._added, self._replaced, self._highlight):
                 yield Substitution(
                     match.start,
@@ -65,17 +67,13 @@ class ChangesRule(SubstitutionRule):
 
 def _sort_replacements(
     replacements: typing.List[Substitution],
-) -> typing.Iterable[Substitution]:
-    replacements.sort()
-    if len(replacements) <= 1:
-        return replacements
-    replacements_ = []
-    for i, e in enumerate(replacements[:-1]):
-        if e.intersects(replacements[i + 1]):
-            continue
-        else:
-            replacements_ += [e]
-    return replacements_
+) -> typing.List[Substitution]:
+    """
+    Sort the replacements and drop every one that intersects its successor. The
+    dropped ones are found again in the next iteration.
+    """
+    intersects = sort_ranges(replacements)
+    return [r for r, i in zip(replacements, intersects) if not i]
 
 
 def _find_substitutions(
@@ -83,7 +81,7 @@ def _find_substitutions(
 ) -> typing.List[Substitution]:
     replacements = []
     for rule in replacement_rules:
-        replacements += list(rule.find_all(content))
+        replacements.extend(rule.find_all(content))
     return replacements
 
 
@@ -91,26 +89,28 @@ def apply_substitution_rules(
     content: TraceableString,
     replacement_rules: typing.List[SubstitutionRule],
 ):
+    if not replacement_rules:
+        return content
     replacements = _find_substitutions(content, replacement_rules)
     max_itererations = 10
     while replacements and max_itererations:
         replacements = _sort_replacements(replacements)
-        offset = 0
+        # Build the new content in a single pass instead of splicing in every
+        # replacement on its own, which would copy the whole content each time.
+        parts = []
+        last = 0
         for replacement in replacements:
+            parts.append(content[last : replacement.start])
             if replacement.replacement_text:
-                content = (
-                    content[: replacement.start + offset]
-                    + replacement.replacement_text
-                    + content[replacement.end + offset :]
-                )
-                offset -= len(replacement) - len(replacement.replacement_text)
-            else:
-                content = (
-                    content[: replacement.start + offset]
-                    + content[replacement.end + offset :]
-                )
-                offset -= len(replacement)
+                parts.append(replacement.replacement_text)
+            last = replacement.end
+        parts.append(content[last:])
+        substituted = TraceableString.concat(parts)
         max_itererations -= 1
+        if str(substituted) == str(content):
+            # The rules would only find the same substitutions again.
+            return substituted
+        content = substituted
         replacements = _find_substitutions(content, replacement_rules)
     if max_itererations == 0:
         logging.getLogger("flachtex").warning(
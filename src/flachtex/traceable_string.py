@@ -1,9 +1,20 @@
+import bisect
+import sys
 import typing
+from array import array
 
 from .utils import compute_row_index
 
 
+def _intern(origin: typing.Any) -> typing.Any:
+    # The same file path is the origin of many ranges. Interning makes them share a
+    # single string object.
+    return sys.intern(origin) if isinstance(origin, str) else origin
+
+
 class OriginOfRange:
+    __slots__ = ("origin", "begin", "end", "offset")
+
     def __init__(self, begin: int, end: int, origin, offset: int = 0):
         self.origin = origin
         self.begin = begin
@@ -76,11 +87,60 @@ class OriginOfRange:
 
 
 class TraceableString:
+    """
+    A string that knows for every character where it came from. The origins are
+    stored as parallel arrays (begin, end, offset, origin) of ranges sorted by their
+    beginning, such that no Python object has to be created for every range and
+    the range of a position can be found by binary search.
+    """
+
+    __slots__ = ("content", "_begins", "_ends", "_offsets", "_origins", "_line_index")
+
     def __init__(self, content: str, origin: typing.Any, offset: int = 0):
         self.content = content
-        self.origins = [OriginOfRange(0, len(content), origin, offset)]
+        self._begins = array("q", [0])
+        self._ends = array("q", [len(content)])
+        self._offsets = array("q", [offset])
+        self._origins = [_intern(origin)]
         self._line_index = None
 
+    @staticmethod
+    def _create(
+        content: str,
+        begins: array,
+        ends: array,
+        offsets: array,
+        origins: typing.List[typing.Any],
+    ) -> "TraceableString":
+        # bypasses __init__, which would create arrays just to be replaced
+        ts = TraceableString.__new__(TraceableString)
+        ts.content = content
+        ts._line_index = None
+        ts._begins = begins
+        ts._ends = ends
+        ts._offsets = offsets
+        ts._origins = origins
+        return ts
+
+    @property
+    def origins(self) -> typing.List[OriginOfRange]:
+        """
+        The origins of the ranges. They are only created on demand.
+        """
+        return [
+            OriginOfRange(b, e, o, f)
+            for b, e, f, o in zip(
+                self._begins, self._ends, self._offsets, self._origins
+            )
+        ]
+
+    @origins.setter
+    def origins(self, origins: typing.List[OriginOfRange]):
+        self._begins = array("q", [o.begin for o in origins])
+        self._ends = array("q", [o.end for o in origins])
+        self._offsets = array("q", [o.offset for o in origins])
+        self._origins = [_intern(o.origin) for o in origins]
+
     def __len__(self):
         return len(self.content)
 
@@ -89,9 +149,9 @@ class TraceableString:
 
     def _normalize_slice(self, s: slice):
         start = s.start if s.start is not None else 0
-        start = start if start >= 0 else len(self) - start
+        start = start if start >= 0 else max(0, len(self) + start)
         stop = s.stop if s.stop is not None else len(self)
-        stop = stop if stop >= 0 else len(self) - stop
+        stop = stop if stop >= 0 else max(0, len(self) + stop)
         if stop > len(self):
             raise IndexError()
         if s.step is not None and s.step != 1:
@@ -102,21 +162,30 @@ class TraceableString:
     def __getitem__(self, item):
         if isinstance(item, slice):
             content = self.content[item]
-            start, stop = self._normalize_slice(item)
-            origins = (o.slice(start, stop) for o in self.origins)
-            origins = [o for o in origins if o is not None]
-            ts = TraceableString(content, None)
-            ts.origins = origins
-            return ts
+            start = 0 if item.start is None else item.start
+            stop = len(self.content) if item.stop is None else item.stop
+            if item.step is not None or not 0 <= start <= stop <= len(self.content):
+                # only the uncommon slices need to be normalized
+                start, stop = self._normalize_slice(item)
+            # only the ranges from i to j-1 overlap with the slice
+            i = bisect.bisect_right(self._ends, start)
+            j = max(i, bisect.bisect_left(self._begins, stop))
+            begins = array("q", [max(0, b - start) for b in self._begins[i:j]])
+            ends = array("q", [min(e, stop) - start for e in self._ends[i:j]])
+            offsets = self._offsets[i:j]
+            origins = self._origins[i:j]
+            if begins and self._begins[i] < start:  # the first range is cut
+                offsets[0] += start - self._begins[i]
+            return TraceableString._create(content, begins, ends, offsets, origins)
         return self.content[item]
 
     def get_origin(self, i):
         if i >= len(self):
             raise IndexError()
-        for o in self.origins:
-            if i in o:
-                return o.origin, o.get_offset(i)
-        return None
+        idx = bisect.bisect_right(self._begins, i) - 1
+        if idx < 0 or i >= self._ends[idx]:
+            return None
+        return self._origins[idx], self._offsets[idx] + (i - self._begins[idx])
 
     def _populate_line_index(self):
         self._line_index = compute_row_index(self.content)
@@ -132,12 +201,14 @@ class TraceableString:
             "content": self.content,
             "origins": [
                 {
-                    "begin": o.begin,
-                    "end": o.end,
-                    "origin": str(o.origin),
-                    "offset": o.offset,
+                    "begin": b,
+                    "end": e,
+                    "origin": str(o),
+                    "offset": f,
                 }
-                for o in self.origins
+                for b, e, f, o in zip(
+                    self._begins, self._ends, self._offsets, self._origins
+                )
             ],
         }
 
@@ -161,15 +232,75 @@ class TraceableString:
             raise ValueError(msg)
         return ts
 
+    @staticmethod
+    def concat(parts: typing.Iterable["TraceableString"]) -> "TraceableString":
+        """
+        Concatenate many traceable strings at once. Other than adding them one by
+        one, the content and the origins are only copied once.
+        :param parts: The traceable strings to be concatenated.
+        :return: The concatenated traceable string.
+        """
+        contents = []
+        begins, ends, offsets = array("q"), array("q"), array("q")
+        origins = []
+        n = 0
+        for part in parts:
+            if not part.content:
+                continue  # as for __add__, the ranges of empty parts are dropped
+            contents.append(part.content)
+            if (
+                origins
+                and part._origins
+                and ends[-1] == n
+                and part._begins[0] == 0
+                and origins[-1] == part._origins[0]
+                and offsets[-1] + (ends[-1] - begins[-1]) == part._offsets[0]
+            ):
+                # The first range continues the last one, e.g., after removing a
+                # skip. Merging them keeps the number of ranges small.
+                ends[-1] = part._ends[0] + n
+                begins.extend([b + n for b in part._begins[1:]])
+                ends.extend([e + n for e in part._ends[1:]])
+                offsets.extend(part._offsets[1:])
+                origins.extend(part._origins[1:])
+            else:
+                if n:
+                    begins.extend([b + n for b in part._begins])
+                    ends.extend([e + n for e in part._ends])
+                else:  # the ranges of a leading part do not have to be moved
+                    begins.extend(part._begins)
+                    ends.extend(part._ends)
+                offsets.extend(part._offsets)
+                origins.extend(part._origins)
+            n += len(part.content)
+        return TraceableString._create(
+            "".join(contents), begins, ends, offsets, origins
+        )
+
+    def _copy(self) -> "TraceableString":
+        # The arrays can be shared as they are never modified in place.
+        return TraceableString._create(
+            self.content, self._begins, self._ends, self._offsets, self._origins
+        )
+
     def __add__(self, other):
-        ts = TraceableString(self.content + other.content, None)
-        ts.origins = self.origins + [o.move(len(self)) for o in other.origins]
-        return ts
+        # The ranges of an empty side do not cover anything and are dropped.
+        if not other.content:
+            return self._copy()
+        if not self.content:
+            return other._copy()
+        return TraceableString.concat((self, other))
 
     def __eq__(self, other):
         if not isinstance(other, TraceableString):
             return False
-        return self.content == other.content and self.origins == other.origins
+        return (
+            self.content == other.content
+            and self._begins == other._begins
+            and self._ends == other._ends
+            and self._offsets == other._offsets
+            and self._origins == other._origins
+        )
 
     def __repr__(self):
         return f"TraceableString({self.content}, {self.origins})"
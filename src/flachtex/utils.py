@@ -1,5 +1,8 @@
+import operator
+import re
 import typing
-import unittest
+
+_NEWLINE_RE = re.compile("\n")
 
 
 class Range:
@@ -7,6 +10,8 @@ class Range:
     A simple range (for within a text)
     """
 
+    __slots__ = ("start", "end")
+
     def __init__(self, start: int, end: int):
         self.start = start
         self.end = end
@@ -32,30 +37,24 @@ class Range:
         return f"[{self.start}:{self.end}]"
 
 
+_RangeT = typing.TypeVar("_RangeT", bound=Range)
+
+
+def sort_ranges(ranges: typing.List[_RangeT]) -> typing.List[bool]:
+    """
+    Sort the ranges by their start (in place) and tell for each one whether it
+    intersects its successor. As the ranges are sorted, only the neighbors need to
+    be compared. The last range has no successor.
+    :param ranges: The ranges to be sorted.
+    :return: For every range, whether it intersects the next one.
+    """
+    ranges.sort(key=operator.attrgetter("start"))
+    intersects = [f.start < e.end for e, f in zip(ranges, ranges[1:])]
+    if ranges:
+        intersects.append(False)
+    return intersects
+
+
 def compute_row_index(content: str) -> typing.List[int]:
-    index = [0]
-    i = content.find("\n")
-    while i >= 0:
-        index.append(i + 1)
-        i = content.find("\n", i + 1)
-    return index
-
-
-class TestRowIndex(unittest.TestCase):
-    def test_1(self):
-        text = "0\n1\n2\n3\n4\n"
-        index = compute_row_index(text)
-        for i in text.split("\n"):
-            b = text.find(i)
-            if i:
-                assert index[int(i)] == b
-        print(index)
-
-    def test_2(self):
-        text = "\n1\n2\n3\n4\n"
-        index = compute_row_index(text)
-        for i in text.split("\n"):
-            b = text.find(i)
-            if i:
-                assert index[int(i)] == b
-        print(index)
+    # a single C-level scan is faster than calling str.find for every line
+    return [0] + [match.end() for match in _NEWLINE_RE.finditer(content)]
@@ -60,3 +60,34 @@ class CommandFinderTest(unittest.TestCase):
         cf.add_command("renewcommand", 2)
         text = "This is a simple string\n bla \\renewcommand\\thesubfigure{(\\alph{subfigure})} asdas"
         assert cf.find(text) is None
+
+    def test_escaped(self):
+        cf = CommandFinder()
+        cf.add_command("todo", 1)
+        text = "\\\\todo{no} \\todo{a\\}b}"
+        assert cf.find(text) == CommandMatch("todo", 11, 22, [(17, 21)], [])
+
+    def test_unbalanced(self):
+        cf = CommandFinder()
+        cf.add_command("todo", 1)
+        text = "This is a \\todo{bla simple string\n bla"
+        assert cf.find(text) is None
+
+    def test_find_all(self):
+        cf = CommandFinder()
+        cf.add_command("todo", 1)
+        text = "\\todo{a} b \\todo{c\\todo{d}} %\\todo{e}\n\\todo{f}"
+        matches = list(cf.find_all(text))
+        assert [text[m.start : m.end] for m in matches] == [
+            "\\todo{a}",
+            "\\todo{c\\todo{d}}",
+            "\\todo{f}",
+        ]
+
+    def test_add_command_after_find(self):
+        cf = CommandFinder()
+        cf.add_command("todo", 1)
+        text = "\\todox{a} \\todo*{b} \\note{c}"
+        assert cf.find(text) is None
+        cf.add_command("note", 1)
+        assert cf.find(text) == CommandMatch("note", 20, 28, [(26, 27)], [])
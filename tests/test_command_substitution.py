@@ -1,6 +1,8 @@
+import time
 import unittest
 
-from flachtex import TraceableString
+from flachtex import FileFinder, Preprocessor, TraceableString
+from flachtex.__main__ import find_command_definitions
 from flachtex.command_substitution import (
     NewCommandDefinition,
     NewCommandSubstitution,
@@ -98,3 +100,87 @@ class CommandSubstitutionTest(unittest.TestCase):
             str(s).strip()
             == "\\newcommand{\\test}[2]{#2-#1}\n\\newcommand{\\testa}[2]{#2-#1.}\n\\newcommand{\\testb}[2]{#2#1.}\n\\begin{document}\nb-a.\\\\\nb-a..\\\\\nba..\nbbaa..\n\\end{document}".strip()
         )
+
+    def test_repeated_parameter(self):
+        sub = NewCommandSubstitution()
+        sub.new_command(
+            NewCommandDefinition(
+                TraceableString("twice", None), 1, TraceableString("#1#1-#1", None)
+            )
+        )
+        s = apply_substitution_rules(TraceableString("Bla \\twice{ab}.", None), [sub])
+        assert str(s) == "Bla abab-ab."
+
+    def test_space_at_end(self):
+        sub = NewCommandSubstitution()
+        sub.new_command(
+            NewCommandDefinition(
+                TraceableString("test", None), 0, TraceableString("TEST", None)
+            )
+        )
+        s = apply_substitution_rules(TraceableString("Bla \\test  ", None), [sub])
+        assert str(s) == "Bla TEST{}"
+
+    def test_commented_definitions(self):
+        doc = TraceableString(
+            "\\newcommand{\\a}{A} % \\newcommand{\\b}{B}\n"
+            "\\\\newcommand{\\c}{C}\n"
+            "\\renewcommand*{\\d}%\n[2]{#1{x}#2}",
+            "main.tex",
+        )
+        cmds = list(find_new_commands(doc))
+        assert [str(cmd.name) for cmd in cmds] == ["\\a", "\\d"]
+        assert [cmd.num_parameters for cmd in cmds] == [0, 2]
+        assert str(cmds[1].command) == "#1{x}#2"
+
+    def test_parameter_origins(self):
+        doc = TraceableString(
+            "\\newcommand{\\pair}[2]{(#1, #2)}\n\\pair{a}{b}", "main.tex"
+        )
+        sub = NewCommandSubstitution()
+        for cmd in find_new_commands(doc):
+            sub.new_command(cmd)
+        s = apply_substitution_rules(doc, [sub])
+        assert str(s).endswith("\n(a, b)")
+        n = len(str(doc).split("\n")[0]) + 1
+        # the parameters origin from the usage, the rest from the definition
+        assert s.get_origin(n + 1) == ("main.tex", str(doc).index("{a}") + 1)
+        assert s.get_origin(n + 4) == ("main.tex", str(doc).index("{b}") + 1)
+        assert s.get_origin(n) == ("main.tex", str(doc).index("(#1"))
+
+    def test_unchanged_substitution(self):
+        doc = TraceableString("\\newcommand{\\x}{\\x}\n\\x", "main.tex")
+        sub = NewCommandSubstitution()
+        for cmd in find_new_commands(doc):
+            sub.new_command(cmd)
+        calls = []
+
+        class CountingRule:
+            def find_all(self, content):
+                calls.append(content)
+                return sub.find_all(content)
+
+        s = apply_substitution_rules(doc, [CountingRule()])
+        assert str(s) == str(doc)
+        # stops after the first substitution as nothing has changed
+        assert len(calls) == 1
+
+    def test_command_with_import(self):
+        files = {
+            "main.tex": "\\newcommand{\\myinput}{\\input}\n\\myinput{chapters/a}\n",
+            "chapters/a.tex": "chapter A",
+        }
+        preprocessor = Preprocessor("/")
+        preprocessor.file_finder = FileFinder("/", files)
+        preprocessor.substitution_rules.append(
+            find_command_definitions("main.tex", files)
+        )
+        doc = preprocessor.expand_file("main.tex")
+        assert str(doc) == "\\newcommand{\\myinput}{\\input}\nchapter A\n"
+
+    def test_comment_run_without_body(self):
+        # a run of % must not make the definition regex backtrack exponentially
+        doc = TraceableString("\\newcommand{\\x}" + "%" * 40 + "\n\\y", "main.tex")
+        start = time.perf_counter()
+        assert list(find_new_commands(doc)) == []
+        assert time.perf_counter() - start < 1.0
@@ -0,0 +1,16 @@
+import unittest
+
+from flachtex import TraceableString, remove_comments
+
+
+class RemoveCommentsTest(unittest.TestCase):
+    def test_remove_comments(self):
+        content = TraceableString("a % x\nb\\%c % y\n%z\nd", origin="main.tex")
+        result = remove_comments(content)
+        assert str(result) == "a b\\%c d"
+        assert result.get_origin(2) == ("main.tex", 6)
+        assert result.get_origin(7) == ("main.tex", 18)
+
+    def test_no_comments(self):
+        content = TraceableString("a\nb\n", origin="main.tex")
+        assert remove_comments(content) == content
@@ -0,0 +1,23 @@
+import unittest
+
+from flachtex import FileFinder, Preprocessor
+from flachtex.cycle_prevention import CycleException, CyclePrevention
+
+
+class CyclePreventionTest(unittest.TestCase):
+    def test_push_pop(self):
+        cp = CyclePrevention()
+        cp.push("main.tex")
+        cp.push("sub.tex")
+        cp.pop()
+        cp.push("sub.tex")
+        self.assertRaises(CycleException, lambda: cp.push("./main.tex"))
+
+    def test_cyclic_import(self):
+        test_document = {
+            "main.tex": "\\input{sub.tex}\n",
+            "sub.tex": "\\input{main.tex}\n",
+        }
+        preprocessor = Preprocessor("/")
+        preprocessor.file_finder = FileFinder("/", test_document)
+        self.assertRaises(CycleException, lambda: preprocessor.expand_file("main.tex"))
@@ -0,0 +1,46 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from flachtex import FileFinder, Preprocessor
+from flachtex.filefinder import CachedFileSystem, FileSystem
+
+
+class FileFinderTest(unittest.TestCase):
+    def test_find(self):
+        file_finder = FileFinder("/", {"main.tex": "", "sub/a.tex": ""})
+        assert file_finder.find_best_matching_path("a", "sub/main.tex") == "sub/a.tex"
+        assert file_finder.find_best_matching_path("main", "sub/a.tex") == "main.tex"
+
+    def test_not_found(self):
+        file_finder = FileFinder("/", {"main.tex": ""})
+        with self.assertRaises(KeyError) as cm:
+            file_finder.find_best_matching_path("missing.tex", "sub/a.tex")
+        assert "sub/missing.tex" in str(cm.exception)
+
+    def test_cached_file_system(self):
+        files = {"main.tex": "content"}
+        file_system = CachedFileSystem(files)
+        assert file_system["main.tex"] == "content"
+        files["main.tex"] = "changed"
+        assert "main.tex" in file_system
+        assert file_system["main.tex"] == "content"
+        assert "sub.tex" not in file_system
+
+    def test_changed_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            main = Path(tmp) / "main.tex"
+            main.write_text("\\input{b}\n")
+            preprocessor = Preprocessor(tmp)
+            self.assertRaises(KeyError, lambda: preprocessor.expand_file(str(main)))
+            (Path(tmp) / "b.tex").write_text("b")
+            assert str(preprocessor.expand_file(str(main))) == "b\n"
+
+    def test_removed_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "a.tex"
+            path.write_text("a")
+            file_system = FileSystem()
+            assert str(path) in file_system
+            path.unlink()
+            self.assertRaises(KeyError, lambda: file_system[str(path)])
@@ -0,0 +1,65 @@
+import re
+import unittest
+
+from flachtex.rules import BASIC_INCLUDE_RULES, NativeImportRule, find_imports
+
+
+class ImportRulesTest(unittest.TestCase):
+    def find(self, content):
+        return [
+            (i.start, i.end, i.path) for i in find_imports(content, BASIC_INCLUDE_RULES)
+        ]
+
+    def test_multiple_per_line(self):
+        assert self.find("a \\input{x} b \\include{y}\n") == [
+            (2, 11, "x"),
+            (14, 25, "y"),
+        ]
+
+    def test_commented(self):
+        assert self.find("\\input{x} % \\input{y}\n%\\input{z}\n") == [(0, 9, "x")]
+        assert self.find("50\\% \\input{x}") == [(5, 14, "x")]
+        # a double backslash is a line break and not the start of a command
+        assert self.find("a \\\\input{x}") == []
+
+    def test_unclosed_in_comment(self):
+        # the unclosed command in the comment must not swallow the next line
+        assert self.find("% old: \\input{intro\n\\input{chapter1}\n") == [
+            (20, 36, "chapter1")
+        ]
+        assert self.find("\\input{a}% \\input{b\n\\input{c}") == [
+            (0, 9, "a"),
+            (20, 29, "c"),
+        ]
+
+    def test_subimport(self):
+        assert self.find(
+            "\\subimport{a}{b} \\subimport*{c}{d} % \\subimport{e}{f}"
+        ) == [
+            (0, 16, "a/b"),
+            (17, 34, "c/d"),
+        ]
+
+    def test_explicit_import(self):
+        content = (
+            "%%FLACHTEX-EXPLICIT-IMPORT[a.tex]\n"
+            "  %%FLACHTEX-EXPLICIT-IMPORT[b.tex]\n"
+            "x %%FLACHTEX-EXPLICIT-IMPORT[c.tex]"
+        )
+        assert self.find(content) == [(0, 33, "a.tex"), (36, 69, "b.tex")]
+
+    def test_changed_pattern(self):
+        # the trigger substrings only hold for the pattern of NativeImportRule
+        class LoadRule(NativeImportRule):
+            _REGEX = re.compile(r"(?P<command>\\load\{(?P<path>[^}]*)\})")
+
+        instance = NativeImportRule()
+        instance.regex = LoadRule._REGEX
+        for rule in (instance, LoadRule()):
+            assert [i.path for i in find_imports("\\load{x}", [rule])] == ["x"]
+
+    def test_unclosed_explicit_import(self):
+        content = (
+            "x %%FLACHTEX-EXPLICIT-IMPORT[a.tex\n%%FLACHTEX-EXPLICIT-IMPORT[b.tex]"
+        )
+        assert self.find(content) == [(35, 68, "b.tex")]
@@ -40,3 +40,18 @@ class OriginTest(unittest.TestCase):
         assert flat.get_origin(4) == ("main.tex", 4)
         assert flat.get_origin_of_line(2, 4) == ("sub.tex", 4)
         assert flat.get_origin(17) == ("sub.tex", 3)
+
+    def test_repeated_import(self):
+        test_document = {
+            "main.tex": "\\input{a.tex}\n\\input{b.tex}\n",
+            "a.tex": "A\n\\input{sub.tex}",
+            "b.tex": "B\n\\input{sub.tex}",
+            "sub.tex": "sub",
+        }
+        flat, sources = self.flatten(test_document)
+        assert str(flat) == "A\nsub\nB\nsub\n"
+        assert sources["a.tex"]["includes"] == ["sub.tex"]
+        assert sources["b.tex"]["includes"] == ["sub.tex"]
+        assert flat.get_origin_of_line(1, 1) == ("sub.tex", 1)
+        assert flat.get_origin_of_line(2, 0) == ("b.tex", 0)
+        assert flat.get_origin_of_line(3, 2) == ("sub.tex", 2)
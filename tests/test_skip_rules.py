@@ -0,0 +1,60 @@
+import unittest
+
+from flachtex import TraceableString
+from flachtex.rules import BasicSkipRule, TodonotesRule, apply_skip_rules
+
+
+class BasicSkipRuleTest(unittest.TestCase):
+    def skip(self, content):
+        return str(apply_skip_rules(TraceableString(content, None), [BasicSkipRule()]))
+
+    def test_skip(self):
+        content = (
+            "line 0\n%%FLACHTEX-SKIP-START\nline 2\n%%FLACHTEX-SKIP-STOP\nline 4\n"
+        )
+        assert self.skip(content) == "line 0\n\nline 4\n"
+
+    def test_skip_twice(self):
+        content = (
+            "a\n  %%FLACHTEX-SKIP-START\nb\n  %%FLACHTEX-SKIP-STOP c\n"
+            "%%FLACHTEX-SKIP-START\nd\n%%FLACHTEX-SKIP-STOP\ne"
+        )
+        assert self.skip(content) == "a\n c\n\ne"
+
+    def test_not_at_line_start(self):
+        content = "a %%FLACHTEX-SKIP-START\nb\n%%FLACHTEX-SKIP-STOP\nc"
+        assert self.skip(content) == content
+        content = "%%FLACHTEX-SKIP-START\nb x %%FLACHTEX-SKIP-STOP\nc"
+        assert self.skip(content) == content
+        content = "%%FLACHTEX-SKIP-START\nb\n%%FLACHTEX-SKIP-START\nc"
+        assert self.skip(content) == content
+
+    def test_intersecting(self):
+        content = TraceableString(
+            "%%FLACHTEX-SKIP-START\nb\n%%FLACHTEX-SKIP-STOP\nc", None
+        )
+        rules = [BasicSkipRule(), BasicSkipRule()]
+        self.assertRaises(ValueError, lambda: apply_skip_rules(content, rules))
+
+    def test_subclass_markers(self):
+        class MySkipRule(BasicSkipRule):
+            START = "%%MY-SKIP-START"
+            STOP = "%%MY-SKIP-STOP"
+
+        content = TraceableString("a\n%%MY-SKIP-START\nb\n%%MY-SKIP-STOP\nc", None)
+        assert str(apply_skip_rules(content, [MySkipRule()])) == "a\n\nc"
+
+
+class TodonotesRuleTest(unittest.TestCase):
+    def test_todo(self):
+        content = TraceableString("a\\todo[inline]{b} c", None)
+        assert str(apply_skip_rules(content, [TodonotesRule()])) == "a c"
+
+    def test_subclass_commands(self):
+        class NoteRule(TodonotesRule):
+            def __init__(self):
+                super().__init__()
+                self._command_finder.add_command("note", 1)
+
+        content = TraceableString("a\\note{b} c", None)
+        assert str(apply_skip_rules(content, [NoteRule()])) == "a c"
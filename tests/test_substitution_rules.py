@@ -0,0 +1,26 @@
+import unittest
+
+from flachtex import TraceableString
+from flachtex.rules import ChangesRule, Substitution, apply_substitution_rules
+from flachtex.rules.substitution_rules import _sort_replacements
+
+
+class SubstitutionRulesTest(unittest.TestCase):
+    def test_sort_replacements(self):
+        replacements = [
+            Substitution(10, 12, None),
+            Substitution(0, 8, None),
+            Substitution(2, 4, None),
+            Substitution(20, 25, None),
+        ]
+        sorted_ = _sort_replacements(replacements)
+        # the outer replacement is postponed to the next iteration
+        assert [(r.start, r.end) for r in sorted_] == [(2, 4), (10, 12), (20, 25)]
+
+    def test_changes(self):
+        content = TraceableString(
+            "a \\added{b} \\deleted{c} \\replaced{d}{e} \\added{\\added{f}}", "main.tex"
+        )
+        result = apply_substitution_rules(content, [ChangesRule()])
+        assert str(result) == "a b  d f"
+        assert result.get_origin(2) == ("main.tex", 9)
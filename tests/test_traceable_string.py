@@ -1,3 +1,4 @@
+import json
 import unittest
 
 from flachtex import TraceableString
@@ -28,3 +29,54 @@ class TraceableStringTest(unittest.TestCase):
         data = ts.to_json()
         data["origins"].append([])
         self.assertRaises(ValueError, lambda: TraceableString.from_json(data))
+
+    def test_slice(self):
+        ts = TraceableString("left", "A", 0) + TraceableString("right", "B", 3)
+        ts = ts[2:6]
+        assert str(ts) == "ftri"
+        assert ts.get_origin(0) == ("A", 2)
+        assert ts.get_origin(1) == ("A", 3)
+        assert ts.get_origin(2) == ("B", 3)
+        assert ts.get_origin(3) == ("B", 4)
+
+    def test_negative_slice(self):
+        ts = TraceableString("left", "A", 0) + TraceableString("right", "B", 3)
+        assert str(ts[-6:-2]) == "trig"
+        assert ts[-6:-2].get_origin(0) == ("A", 3)
+        assert ts[-6:-2].get_origin(1) == ("B", 3)
+        assert str(ts[-20:2]) == "le"
+        self.assertRaises(IndexError, lambda: ts.get_origin(9))
+        self.assertRaises(IndexError, lambda: ts[9])
+
+    def test_add_merges_ranges(self):
+        ts = TraceableString("left right", "A", 0)
+        joined = ts[:4] + ts[4:]
+        assert joined == ts
+        assert len(joined.origins) == 1
+        assert ts[:4] + TraceableString("", "B") == ts[:4]
+        assert len((ts[:4] + ts[5:]).origins) == 2
+
+    def test_concat(self):
+        parts = [
+            TraceableString("left", "A", 0),
+            TraceableString("", "B", 0),
+            TraceableString("right", "C", 2),
+        ]
+        ts = TraceableString.concat(parts)
+        assert str(ts) == "leftright"
+        assert ts == parts[0] + parts[1] + parts[2]
+        assert ts.get_origin(4) == ("C", 2)
+
+    def test_concat_merges_ranges(self):
+        ts = TraceableString("abcdefghij", "A") + TraceableString("x", "B")
+        parts = [ts[0:2], ts[2:5], TraceableString("", "C"), ts[5:8], ts[8:]]
+        concatenated = TraceableString.concat(parts)
+        assert concatenated == ts
+        assert [o.origin for o in concatenated.origins] == ["A", "B"]
+
+    def test_json_interned_origins(self):
+        path = "chapters/introduction.tex"
+        ts = TraceableString("left", path, 0) + TraceableString("right", path, 0)
+        ts_ = TraceableString.from_json(json.loads(json.dumps(ts.to_json())))
+        origins = ts_.origins
+        assert origins[0].origin is origins[1].origin
@@ -0,0 +1,29 @@
+import unittest
+
+from flachtex.utils import Range, compute_row_index, sort_ranges
+
+
+class TestRowIndex(unittest.TestCase):
+    def test_1(self):
+        text = "0\n1\n2\n3\n4\n"
+        index = compute_row_index(text)
+        for i in text.split("\n"):
+            b = text.find(i)
+            if i:
+                assert index[int(i)] == b
+
+    def test_2(self):
+        text = "\n1\n2\n3\n4\n"
+        index = compute_row_index(text)
+        for i in text.split("\n"):
+            b = text.find(i)
+            if i:
+                assert index[int(i)] == b
+
+
+class TestSortRanges(unittest.TestCase):
+    def test_sort_ranges(self):
+        ranges = [Range(5, 7), Range(0, 2), Range(6, 8), Range(2, 5)]
+        assert sort_ranges(ranges) == [False, False, True, False]
+        assert [r.start for r in ranges] == [0, 2, 5, 6]
+        assert sort_ranges([]) == []